@@ -1,42 +1,61 @@
 """Convert parsed telemetry packets into a common shape used by the tuner.
 
-The optimization/scoring code expects a single dictionary format no matter
-which telemetry packet type the laser emitted.
+The collector stores the same sample tuple no matter which telemetry packet
+type the laser emitted; `pick_mapper` returns the converter for a packet's
+schema.
 """
 
+import sys
 
-def map_telemetry_values(raw: dict) -> dict:
-    """Normalize one telemetry sample into fields the rest of the app uses.
 
-    Why this exists:
-    - The controller can send multiple packet styles.
-    - Later code should not care about packet style details.
-    - This function gives everything a single, predictable format.
+# Shared instances of the status values the firmware sends, so per-sample
+# status strings are reused instead of allocated and compare by identity.
+_STATUSES = {s: sys.intern(s) for s in ("RUNNING", "IDLE", "OK", "ERROR", "DONE", "ABORT")}
+
+
+def _status_text(value) -> str:
+    """Return the shared instance of a status string."""
+    status = _STATUSES.get(value)
+    if status is None:
+        status = sys.intern(str(value))
+    return status
+
+
+def _map_power_packet(raw: dict) -> tuple:
+    """Map a B0/key-value power packet to a collector sample tuple."""
+    # Measured power is the process value, pulse width the control output.
+    t_raw = raw.get("t")
+    return (
+        float(t_raw) if t_raw is not None else None,
+        float(raw["current_power"]),
+        float(raw["pulse_width"]),
+        _status_text(raw.get("status", "RUNNING")),
+        float(raw["initial_power"]),
+    )
+
+
+def _map_legacy(raw: dict) -> tuple:
+    """Map a legacy "DATA ..." packet to a collector sample tuple."""
+    return (
+        float(raw["t"]),
+        float(raw["y"]),
+        float(raw["u"]),
+        _status_text(raw["status"]),
+        None,
+    )
+
+
+def pick_mapper(sample_raw: dict):
+    """Return the sample mapper that matches this parsed packet's schema.
+
+    A telemetry stream keeps one packet style, so the collector picks the
+    mapper once and reuses it instead of re-checking the schema per line.
+
+    Mappers return `(time_s, process_value, control_output, status,
+    initial_power)`. `time_s` is None for packets without an explicit time,
+    and `initial_power` is None for legacy DATA packets.
     """
-    # B0 debug packets include explicit power and pulse information.
-    if "initial_power" in raw and "current_power" in raw:
-        pulse_period = float(raw["pulse_period"])
-        pulse_width = float(raw["pulse_width"])
-        # Duty cycle is "how much of each pulse period is ON".
-        duty_cycle = (pulse_width / pulse_period) if pulse_period > 0 else 0.0
-        # For power tuning, process value should be actual measured power.
-        process_value = float(raw["current_power"])
-        return {
-            "time_s": float(raw["t"]) if raw.get("t") is not None else None,
-            "process_value": process_value,
-            "control_output": pulse_width,
-            "status": str(raw.get("status", "RUNNING")),
-            "initial_power": float(raw["initial_power"]),
-            "current_power": float(raw["current_power"]),
-            "pulse_period": pulse_period,
-            "pulse_width": pulse_width,
-            "duty_cycle": duty_cycle,
-        }
-
-    # Legacy "DATA ..." packets already expose process output directly as y/u.
-    return {
-        "time_s": float(raw["t"]),
-        "process_value": float(raw["y"]),
-        "control_output": float(raw["u"]),
-        "status": str(raw["status"]),
-    }
+    if "initial_power" in sample_raw and "current_power" in sample_raw:
+        return _map_power_packet
+    return _map_legacy
+
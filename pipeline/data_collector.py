@@ -6,8 +6,10 @@ parsing/mapping to the dedicated protocol/domain layers.
 
 import time
 
+import numpy as np
+
 from protocol.reply_parser import parse_telemetry_line
-from domain.value_mapper import map_telemetry_values
+from domain.value_mapper import pick_mapper
 
 
 def collect_trial_data(
@@ -19,32 +21,50 @@ def collect_trial_data(
     stop_on_done: bool = True,
     on_sample=None,
     on_done=None,
+    capacity_hint: int = 256,
 ):
     """Collect one block of telemetry samples from the serial stream.
 
-    Output format:
+    Output format (numpy arrays, one entry per sample):
     - t_vals: time values per sample
     - y_vals: measured process values (power)
     - u_vals: control output values
     - status_vals: status text per sample
 
+    `capacity_hint` sizes the sample buffers up front; they double in size
+    if a capture runs longer than expected.
+
     Stop conditions:
     - fixed duration has elapsed (if duration_s is set), or
     - device says "OK DONE" and stop_on_done=True, or
     - callback requests early stop.
+
+    `on_sample(t_val, sample)` receives each mapped sample tuple, in the
+    layout documented on `pick_mapper`.
     """
-    # We build plain Python lists first because append-in-a-loop is fast/safe.
-    t_vals, y_vals, u_vals, status_vals = [], [], [], []
+    # Preallocate sample buffers so each sample is a few indexed stores.
+    capacity = max(1, int(capacity_hint))
+    t_arr = np.empty(capacity, dtype=np.float64)
+    y_arr = np.empty(capacity, dtype=np.float64)
+    u_arr = np.empty(capacity, dtype=np.float64)
+    status_arr = np.empty(capacity, dtype=object)
     sample_idx = 0
-    t_start = time.monotonic()
+    # Packet schema is detected on the first sample and reused afterwards.
+    map_sample = None
+
+    # Bind hot-loop lookups to locals once instead of per sample.
+    read_line = io.read_line
+    monotonic = time.monotonic
+    parse_line = parse_telemetry_line
+    deadline = (monotonic() + duration_s) if duration_s is not None else None
 
     while True:
         # Time-window mode: leave once the requested capture time has passed.
-        if duration_s is not None and (time.monotonic() - t_start) >= duration_s:
+        if deadline is not None and monotonic() >= deadline:
             break
 
         try:
-            line = io.read_line(timeout=line_timeout)
+            line = read_line(timeout=line_timeout)
         except TimeoutError:
             # Timeouts are expected sometimes on serial links, so keep waiting.
             continue
@@ -52,10 +72,17 @@ def collect_trial_data(
         line_s = line.strip()
 
         # Try to decode this line as a telemetry sample.
-        telemetry = parse_telemetry_line(line_s)
+        telemetry = parse_line(line_s)
         if telemetry is not None:
-            mapped = map_telemetry_values(telemetry)
-            mapped_t = mapped.get("time_s")
+            if map_sample is None:
+                map_sample = pick_mapper(telemetry)
+            try:
+                sample = map_sample(telemetry)
+            except (KeyError, TypeError):
+                # Packet style changed mid-stream; switch mappers.
+                map_sample = pick_mapper(telemetry)
+                sample = map_sample(telemetry)
+            mapped_t, process_value, control_output, status, _ = sample
             if mapped_t is None:
                 # Some packet formats do not include explicit time.
                 # In that case, synthesize time from sample interval if known.
@@ -67,21 +94,33 @@ def collect_trial_data(
             else:
                 t_val = float(mapped_t)
 
-            t_vals.append(t_val)
-            y_vals.append(mapped["process_value"])
-            u_vals.append(mapped["control_output"])
-            status_vals.append(mapped["status"])
+            if sample_idx >= capacity:
+                # Out of room: double every buffer (old values are copied over).
+                capacity *= 2
+                t_arr = np.resize(t_arr, capacity)
+                y_arr = np.resize(y_arr, capacity)
+                u_arr = np.resize(u_arr, capacity)
+                status_arr = np.resize(status_arr, capacity)
+
+            t_arr[sample_idx] = t_val
+            y_arr[sample_idx] = process_value
+            u_arr[sample_idx] = control_output
+            status_arr[sample_idx] = status
             sample_idx += 1
 
             if on_sample is not None:
                 # Caller can stop collection immediately (for safety conditions).
-                stop_now = bool(on_sample(t_val, mapped))
+                stop_now = bool(on_sample(t_val, sample))
                 if stop_now:
                     break
             continue
 
+        # Non-telemetry lines: dispatch on the first character so ACKs, debug
+        # chatter and partial lines skip both prefix comparisons.
+        c0 = line_s[:1]
+
         # Some firmware flows indicate trial completion with this line.
-        if line_s.startswith("OK DONE"):
+        if c0 == "O" and line_s.startswith("OK DONE"):
             if on_done:
                 on_done()
             if stop_on_done:
@@ -89,7 +128,7 @@ def collect_trial_data(
             continue
 
         # Device-reported errors should stop the trial immediately.
-        if line_s.startswith("ERR"):
+        if c0 == "E" and line_s.startswith("ERR"):
             raise RuntimeError(line_s)
 
-    return t_vals, y_vals, u_vals, status_vals
+    return t_arr[:sample_idx], y_arr[:sample_idx], u_arr[:sample_idx], status_arr[:sample_idx]
@@ -13,17 +13,14 @@ def format_pid_value(value: float, field_width: int = 8) -> str:
     The firmware parser expects each field to be right-aligned in a fixed
     width, so spacing is part of the protocol and must be preserved.
     """
+    magnitude = abs(value)
     # Very tiny values are rounded to explicit zero for stable formatting.
-    if abs(value) < 0.001:
-        formatted = "0.0000"
-    elif abs(value) < 10:
-        formatted = f"{value:.4f}"
-    elif abs(value) < 100:
-        formatted = f"{value:.2f}"
-    else:
-        formatted = f"{value:.2f}"
+    if magnitude < 0.001:
+        return f"{'0.0000':>{field_width}}"
 
-    return f"{formatted:>{field_width}}"
+    # Four decimals below 10, two decimals from 10 upwards.
+    precision = 4 if magnitude < 10 else 2
+    return f"{value:>{field_width}.{precision}f}"
 
 
 def compose_set_pid_command(
@@ -55,18 +52,11 @@ def compose_set_pid_command(
         holdoff = holdoff if holdoff is not None else 400.0
         sample_interval = sample_interval if sample_interval is not None else 300.0
 
-    data_parts = [
-        format_pid_value(pw_kp),
-        format_pid_value(pw_ki),
-        format_pid_value(pw_kd),
-        format_pid_value(pp_kp),
-        format_pid_value(pp_ki),
-        format_pid_value(pp_kd),
-        format_pid_value(holdoff),
-        format_pid_value(sample_interval),
-    ]
     # Fixed-width protocol payload: 8 chars per field, left padded with spaces.
-    data = "".join(data_parts)
+    # Precision is chosen per field, so each value is formatted on its own.
+    data = "".join(
+        map(format_pid_value, (pw_kp, pw_ki, pw_kd, pp_kp, pp_ki, pp_kd, holdoff, sample_interval))
+    )
     return compose_frame("B5", data, checksum_fn=checksum_fn)
 
 
@@ -6,14 +6,15 @@ This lets logs/reporting show human-friendly names instead of raw hex IDs.
 import laser_command_ids as CMD
 
 
+# Canonical command IDs are exactly two uppercase hex digits.
+_UPPER_HEX2 = frozenset(f"{i:02X}" for i in range(256))
+
+
 def _is_hex_command_id(value: str) -> bool:
-    """Return True only for two-character hexadecimal IDs (for example 'B6')."""
+    """Return True only for two-character uppercase hex IDs (for example 'B6')."""
     if not isinstance(value, str):
         return False
-    v = value.strip().upper()
-    if len(v) != 2:
-        return False
-    return all(ch in "0123456789ABCDEF" for ch in v)
+    return value.strip() in _UPPER_HEX2
 
 
 def _build_command_name_by_id() -> dict[str, str]:
@@ -24,18 +25,31 @@ def _build_command_name_by_id() -> dict[str, str]:
         if name.startswith("_"):
             continue
         if _is_hex_command_id(value):
-            command_name_by_id[value.strip().upper()] = name
+            command_name_by_id[value.strip()] = name
     return command_name_by_id
 
 
 COMMAND_NAME_BY_ID = _build_command_name_by_id()
 
+# Same table with lowercase keys added, so canonical IDs from callers hit on
+# the first lookup without any string normalization.
+_COMMAND_NAME_ANY_CASE = {
+    **COMMAND_NAME_BY_ID,
+    **{cid.lower(): name for cid, name in COMMAND_NAME_BY_ID.items()},
+}
+
 
 def command_name(command_id_hex2: str) -> str:
     """Translate command ID to name; returns 'UNKNOWN' when not registered."""
+    name = _COMMAND_NAME_ANY_CASE.get(command_id_hex2)
+    if name is not None:
+        return name
+    # Slow path for padded or mixed-case input.
     return COMMAND_NAME_BY_ID.get((command_id_hex2 or "").strip().upper(), "UNKNOWN")
 
 
 def is_supported_command(command_id_hex2: str) -> bool:
     """Quick boolean check used by validation and debugging paths."""
+    if command_id_hex2 in _COMMAND_NAME_ANY_CASE:
+        return True
     return (command_id_hex2 or "").strip().upper() in COMMAND_NAME_BY_ID
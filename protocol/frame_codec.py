@@ -4,17 +4,41 @@ The firmware protocol uses text frames with this shape:
     $<cmd><payload><checksum>\r\n
 """
 
-import re
+import functools
 
 
-FRAME_RE = re.compile(r"^\$[^\r\n]*\r\n$")
+# Every valid 2-character hex field mapped to its value, so validating and
+# decoding a field is one dict lookup.
+_HEX_DIGITS = "0123456789ABCDEFabcdef"
+_HEX2_VALUE = {a + b: int(a + b, 16) for a in _HEX_DIGITS for b in _HEX_DIGITS}
+_HEX2 = frozenset(_HEX2_VALUE)
+# Same table keyed by raw bytes, for parsing frames without decoding them.
+_HEX2_BYTES_VALUE = {key.encode("ascii"): value for key, value in _HEX2_VALUE.items()}
+# Uppercase checksum field for every 8-bit sum, as text and encoded.
+_CHECKSUM_TEXT = tuple(f"{i:02X}" for i in range(256))
+_CHECKSUM_FIELD = tuple(text.encode("ascii") for text in _CHECKSUM_TEXT)
 
 
 def is_framed_command(packet: str) -> bool:
     """
     Returns True only for packets framed as "$...\\r\\n".
     """
-    return isinstance(packet, str) and FRAME_RE.fullmatch(packet) is not None
+    # Literal prefix/suffix checks plus a C-level scan for stray terminators;
+    # the framing is fixed, so no regex engine is needed.
+    if not isinstance(packet, str) or not packet.startswith("$") or not packet.endswith("\r\n"):
+        return False
+    body = packet[1:-2]
+    return "\r" not in body and "\n" not in body
+
+
+def checksum_8bit(text: str) -> int:
+    """Return the 8-bit additive checksum of a payload string."""
+    # Latin-1 maps each character to a byte equal to its code point, so
+    # summing the encoded bytes matches sum(ord(ch)) with the loop in C.
+    try:
+        return sum(text.encode("latin-1")) & 0xFF
+    except UnicodeEncodeError:
+        return sum(ord(ch) for ch in text) & 0xFF
 
 
 def default_checksum_hex_2(frame_without_checksum: bytes) -> str:
@@ -22,11 +46,29 @@ def default_checksum_hex_2(frame_without_checksum: bytes) -> str:
     if not isinstance(frame_without_checksum, (bytes, bytearray)):
         raise TypeError("frame_without_checksum must be bytes")
 
+    if frame_without_checksum.isascii():
+        # ASCII bytes equal their code points, so sum the data section
+        # (everything after '$' + 2-char cmd) without decoding.
+        return _CHECKSUM_TEXT[sum(frame_without_checksum[3:]) & 0xFF]
+
+    # Non-ASCII bytes were historically dropped before summing; keep that.
     s = frame_without_checksum.decode("ascii", errors="ignore")
-    # Skip '$' + 2-byte command ID; checksum only uses data section here.
-    data_portion = s[3:] if len(s) >= 3 else ""  # everything after '$' + 2-char cmd
-    checksum = sum(ord(c) for c in data_portion) & 0xFF
-    return f"{checksum:02X}"
+    data_portion = s[3:] if len(s) >= 3 else ""
+    return _CHECKSUM_TEXT[sum(ord(c) for c in data_portion) & 0xFF]
+
+
+@functools.lru_cache(maxsize=64)
+def _frame_prefix(command_id_hex2: str) -> bytes:
+    """Return the encoded "$<id>" frame prefix for a command ID.
+
+    Only a handful of command IDs are ever used, so the normalized and
+    validated prefix is memoized per raw argument.
+    """
+    # Normalize command ID and validate format before building a frame.
+    cid = (command_id_hex2 or "").strip().upper()
+    if cid not in _HEX2:
+        raise ValueError(f"command_id_hex2 must be exactly 2 hex digits, got {command_id_hex2!r}")
+    return b"$" + cid.encode("ascii")
 
 
 def compose_frame(command_id_hex2: str, data: str, checksum_fn=default_checksum_hex_2) -> bytes:
@@ -34,69 +76,94 @@ def compose_frame(command_id_hex2: str, data: str, checksum_fn=default_checksum_
     Compose a framed command according to:
       $XXYYYYCC\\r\\n
     """
-    # Normalize command ID and validate format before building a frame.
-    cid = (command_id_hex2 or "").strip().upper()
-    if not re.fullmatch(r"[0-9A-F]{2}", cid):
-        raise ValueError(f"command_id_hex2 must be exactly 2 hex digits, got {command_id_hex2!r}")
+    prefix = _frame_prefix(command_id_hex2)
 
     # Strip accidental framing/newline characters from payload input.
     payload = data or ""
     if payload.startswith("$"):
         payload = payload[1:]
-    payload = payload.replace("\r", "").replace("\n", "")
+    # Payloads almost never contain terminators; only rebuild when they do.
+    if "\r" in payload or "\n" in payload:
+        payload = payload.replace("\r", "").replace("\n", "")
+
+    payload_bytes = payload.encode("ascii", errors="ignore")
+    if checksum_fn is default_checksum_hex_2:
+        # The default checksum covers only the payload, which is already
+        # encoded here, so sum it once instead of rebuilding and re-reading
+        # the whole frame.
+        return b"".join((prefix, payload_bytes, _CHECKSUM_FIELD[sum(payload_bytes) & 0xFF], b"\r\n"))
 
     # Build checksum over "$<id><payload>" then append checksum + CRLF.
-    frame_wo_checksum = f"${cid}{payload}".encode("ascii", errors="ignore")
+    frame_wo_checksum = prefix + payload_bytes
     checksum = str(checksum_fn(frame_wo_checksum)).strip().upper()
-    if not re.fullmatch(r"[0-9A-F]{2}", checksum):
+    if checksum not in _HEX2:
         raise ValueError(f"checksum_fn must return exactly 2 hex digits, got {checksum!r}")
 
-    return frame_wo_checksum + checksum.encode("ascii") + b"\r\n"
+    # Single join so the finished frame is allocated once.
+    return b"".join((frame_wo_checksum, checksum.encode("ascii"), b"\r\n"))
+
+
+def _is_framed_bytes(packet: bytes) -> bool:
+    """Bytes version of `is_framed_command`, so raw serial lines need no decode."""
+    return (
+        packet[:1] == b"$"
+        and packet[-2:] == b"\r\n"
+        and packet.find(b"\r", 1, -2) < 0
+        and packet.find(b"\n", 1, -2) < 0
+    )
 
 
-def parse_reply(packet: str) -> tuple[int, str]:
+def parse_reply(packet: str | bytes) -> tuple[int, str]:
     """
     Parse and validate a reply frame.
+
+    Accepts the raw bytes read from serial, or a str for older callers.
+    The frame is parsed as bytes, so the checksum is summed directly over
+    byte values without a decode/ord() pass.
     """
-    if not isinstance(packet, str):
-        raise TypeError("packet must be a str")
-    if not is_framed_command(packet):
+    if isinstance(packet, str):
+        try:
+            packet = packet.encode("latin-1")
+        except UnicodeEncodeError:
+            raise ValueError("Invalid packet format: unexpected non-byte characters") from None
+    elif isinstance(packet, bytearray):
+        packet = bytes(packet)
+    elif not isinstance(packet, bytes):
+        raise TypeError("packet must be a str or bytes")
+    if not _is_framed_bytes(packet):
         raise ValueError("Invalid packet format: expected frame starting with '$' and ending with '\\r\\n'")
 
-    # Remove CRLF; keep frame text for parsing.
+    # Remove CRLF; keep frame bytes for parsing.
     pkt = packet[:-2]
     if len(pkt) < 5:
         raise ValueError("Invalid packet format")
 
-    cmd_str = pkt[1:3]
-    received_checksum_str = pkt[-2:]
+    cmd_field = pkt[1:3]
 
     # 'FF' uses an extended 4-hex command identifier format.
-    if cmd_str == "FF":
+    if cmd_field == b"FF":
         if len(pkt) < 10:
             raise ValueError("Invalid FF command format")
-        cmd_hex4 = pkt[3:7]
-        try:
-            cmd_id = int(cmd_hex4, 16)
-        except ValueError:
-            raise ValueError("Invalid extended command ID") from None
-        payload = pkt[7:-2]
-        accumulated = cmd_hex4 + payload
+        cmd_hi = _HEX2_BYTES_VALUE.get(pkt[3:5])
+        cmd_lo = _HEX2_BYTES_VALUE.get(pkt[5:7])
+        if cmd_hi is None or cmd_lo is None:
+            raise ValueError("Invalid extended command ID")
+        cmd_id = (cmd_hi << 8) | cmd_lo
     else:
-        try:
-            cmd_id = int(cmd_str, 16)
-        except ValueError:
-            raise ValueError("Invalid command ID") from None
-        accumulated = pkt[3:-2]
+        cmd_id = _HEX2_BYTES_VALUE.get(cmd_field)
+        if cmd_id is None:
+            raise ValueError("Invalid command ID")
+    # The checksummed section is everything after "$<id>": for FF frames that
+    # is the 4-hex extended ID followed by the payload.
+    accumulated = pkt[3:-2]
 
     # Validate checksum against the payload section from this reply format.
-    calculated = sum(ord(ch) for ch in accumulated) % 256
-    try:
-        received = int(received_checksum_str, 16)
-    except ValueError:
-        raise ValueError("Invalid checksum format") from None
+    calculated = sum(accumulated) & 0xFF
+    received = _HEX2_BYTES_VALUE.get(pkt[-2:])
+    if received is None:
+        raise ValueError("Invalid checksum format")
 
     if calculated != received:
         raise ValueError(f"Checksum validation failed: expected {calculated}, got {received}")
 
-    return cmd_id, accumulated
+    return cmd_id, accumulated.decode("latin-1")
@@ -6,8 +6,9 @@ key/value telemetry).
 """
 
 import re
+import struct
 
-from protocol.frame_codec import is_framed_command
+from protocol.frame_codec import _HEX2_VALUE, checksum_8bit, is_framed_command
 
 
 DATA_RE = re.compile(
@@ -18,11 +19,28 @@ DATA_RE = re.compile(
     r"status=([A-Z]+)"
 )
 KV_RE = re.compile(r"([A-Za-z_]+)=([0-9.eE+-]+)")
+# Accepted key/value aliases per telemetry field, most preferred first.
+KV_FIELD_ALIASES = (
+    ("initial_power", "initial", "init_power", "ip", "p0"),
+    ("current_power", "current", "cur_power", "cp", "p"),
+    ("pulse_period", "period", "pp"),
+    ("pulse_width", "width", "pw"),
+    ("t", "time", "time_s"),
+)
+# Flattened alias -> (field index, preference rank) so each parsed key is
+# resolved with one lookup instead of scanning every alias tuple.
+_KV_ALIAS_SLOT = {
+    alias: (field_index, rank)
+    for field_index, aliases in enumerate(KV_FIELD_ALIASES)
+    for rank, alias in enumerate(aliases)
+}
 DEBUG_B0_RE = re.compile(
     r"^\$B0"
     r"([0-9A-Fa-f]{8}):([0-9A-Fa-f]{8}):([0-9A-Fa-f]{8}):([0-9A-Fa-f]{8})"
     r"([0-9A-Fa-f]{2})$"
 )
+# The four B0 hex fields are big-endian 32-bit words.
+_B0_HEX_WORDS = struct.Struct(">4I")
 DEBUG_B0_DEC_RE = re.compile(
     r"^\$B0\s*"
     r"([0-9]+(?:\.[0-9]+)?):\s*"
@@ -54,15 +72,18 @@ def parse_pid_reply(packet: str) -> dict:
     # Keep exact spacing from device reply for checksum calculation because
     # some firmware includes those spaces in checksum accumulation.
     data_portion = pkt[3:-2]
-    calculated_checksum = sum(ord(ch) for ch in data_portion) % 256
-    received_checksum = int(received_checksum_str, 16)
+    calculated_checksum = checksum_8bit(data_portion)
+    received_checksum = _HEX2_VALUE.get(received_checksum_str)
+    if received_checksum is None:
+        received_checksum = int(received_checksum_str, 16)
     if calculated_checksum != received_checksum:
         raise ValueError(
             f"Checksum mismatch: calculated {calculated_checksum:02X}, received {received_checksum_str}"
         )
 
-    # Split the eight numeric fields from the B6 payload.
-    fields = [f.strip() for f in data_portion.split() if f.strip()]
+    # Split the eight numeric fields from the B6 payload. A bare split()
+    # already drops surrounding whitespace and never yields empty fields.
+    fields = data_portion.split()
     if len(fields) != 8:
         raise ValueError(f"Expected 8 PID parameter fields, got {len(fields)}")
 
@@ -100,8 +121,10 @@ def parse_program_reply(packet: str) -> dict:
     if len(data_portion) != 22:
         raise ValueError(f"Expected 22 characters in GET_PROGRAM payload, got {len(data_portion)}")
 
-    calculated_checksum = sum(ord(ch) for ch in data_portion) % 256
-    received_checksum = int(received_checksum_str, 16)
+    calculated_checksum = checksum_8bit(data_portion)
+    received_checksum = _HEX2_VALUE.get(received_checksum_str)
+    if received_checksum is None:
+        received_checksum = int(received_checksum_str, 16)
     if calculated_checksum != received_checksum:
         raise ValueError(
             f"Checksum mismatch: calculated {calculated_checksum:02X}, received {received_checksum_str}"
@@ -145,33 +168,44 @@ def parse_telemetry_line(line: str) -> dict | None:
     if not s:
         return None
 
+    # Each format has a fixed leading character, so read it once and only
+    # run the prefix checks and regexes that can match.
+    c0 = s[0]
+
+    # Both debug regexes are anchored on "$B0", so skip them for other lines.
+    is_debug = c0 == "$" and s.startswith("$B0")
+
     # B0 hex format.
-    debug_match = DEBUG_B0_RE.match(s)
+    debug_match = DEBUG_B0_RE.match(s) if is_debug else None
     if debug_match is not None:
-        a_hex, b_hex, c_hex, d_hex, rx_checksum_hex = debug_match.groups()
+        rx_checksum_hex = debug_match.group(5)
         # Checksum is computed over everything after "$B0" and before trailing checksum byte.
         payload = s[3:-2]  # exact bytes after command id, before checksum
-        calc_checksum = sum(ord(ch) for ch in payload) % 256
-        rx_checksum = int(rx_checksum_hex, 16)
+        calc_checksum = checksum_8bit(payload)
+        # The regex already guarantees two hex digits, so this cannot miss.
+        rx_checksum = _HEX2_VALUE[rx_checksum_hex]
         if calc_checksum != rx_checksum:
             return None
+        # The regex has validated the layout, so decode all four words in C:
+        # fromhex skips the spaces left where the ':' separators were.
+        initial, current, width, period = _B0_HEX_WORDS.unpack(bytes.fromhex(payload.replace(":", " ")))
         return {
             "t": None,
-            "initial_power": float(int(a_hex, 16)),
-            "current_power": float(int(b_hex, 16)),
-            "pulse_width": float(int(c_hex, 16)),
-            "pulse_period": float(int(d_hex, 16)),
+            "initial_power": float(initial),
+            "current_power": float(current),
+            "pulse_width": float(width),
+            "pulse_period": float(period),
             "status": "RUNNING",
         }
 
     # Decimal B0 variant seen on some firmware:
     #   $B0 514.00: 519.33: 66.188: 100.00033
-    debug_dec_match = DEBUG_B0_DEC_RE.match(s)
+    debug_dec_match = DEBUG_B0_DEC_RE.match(s) if is_debug else None
     if debug_dec_match is not None:
         initial_str, current_str, width_str, period_str, rx_checksum_hex = debug_dec_match.groups()
         payload = s[3:-2]  # exact bytes after command id, before checksum
-        calc_checksum = sum(ord(ch) for ch in payload) % 256
-        rx_checksum = int(rx_checksum_hex, 16)
+        calc_checksum = checksum_8bit(payload)
+        rx_checksum = _HEX2_VALUE[rx_checksum_hex]
         if calc_checksum != rx_checksum:
             return None
         return {
@@ -183,7 +217,7 @@ def parse_telemetry_line(line: str) -> dict | None:
             "status": "RUNNING",
         }
 
-    match = DATA_RE.search(s) if s.startswith("DATA") else None
+    match = DATA_RE.search(s) if c0 == "D" and s.startswith("DATA") else None
     if match is not None:
         t, y, _sp, u, status = match.groups()
         return {
@@ -193,29 +227,31 @@ def parse_telemetry_line(line: str) -> dict | None:
             "status": status,
         }
 
-    # Generic key/value telemetry fallback.
-    kv = {k.strip().lower(): float(v) for k, v in KV_RE.findall(s)}
-
-    def first(keys: tuple[str, ...]) -> float | None:
-        for key in keys:
-            if key in kv:
-                return kv[key]
-        return None
+    # Generic key/value telemetry fallback. When a line carries several
+    # aliases for one field the most preferred alias wins; a repeated key
+    # keeps its last value.
+    values: list[float | None] = [None] * len(KV_FIELD_ALIASES)
+    ranks = [len(_KV_ALIAS_SLOT)] * len(KV_FIELD_ALIASES)
+    for key, raw_value in KV_RE.findall(s):
+        value = float(raw_value)
+        slot = _KV_ALIAS_SLOT.get(key.lower())
+        if slot is None:
+            continue
+        field_index, rank = slot
+        if rank <= ranks[field_index]:
+            ranks[field_index] = rank
+            values[field_index] = value
 
-    initial_power = first(("initial_power", "initial", "init_power", "ip", "p0"))
-    current_power = first(("current_power", "current", "cur_power", "cp", "p"))
-    pulse_period = first(("pulse_period", "period", "pp"))
-    pulse_width = first(("pulse_width", "width", "pw"))
-    t_val = first(("t", "time", "time_s"))
+    initial_power, current_power, pulse_period, pulse_width, t_val = values
 
     if None in (initial_power, current_power, pulse_period, pulse_width):
         return None
 
     return {
         "t": t_val,
-        "initial_power": float(initial_power),
-        "current_power": float(current_power),
-        "pulse_period": float(pulse_period),
-        "pulse_width": float(pulse_width),
+        "initial_power": initial_power,
+        "current_power": current_power,
+        "pulse_period": pulse_period,
+        "pulse_width": pulse_width,
         "status": "RUNNING",
     }
@@ -5,6 +5,8 @@ It knows how to frame commands, read full lines, and wait for ACK/PID replies.
 """
 
 import time
+from collections import deque
+
 import serial
 
 from protocol.frame_codec import compose_frame, default_checksum_hex_2
@@ -12,81 +14,161 @@ from protocol.command_composer import compose_set_pid_command, compose_set_progr
 from protocol.reply_parser import parse_ack, parse_pid_reply, parse_program_reply
 
 
+# Line prefixes of streamed telemetry packets whose RX logging is sampled.
+# B0 debug packets are only sampled when the caller opts in.
+_DATA_PREFIXES = ("DATA",)
+_DATA_AND_DEBUG_PREFIXES = ("DATA", "$B0")
+
+# Upper bound on cached command frames per port. The tuner's constant commands
+# fit well inside it; callers sending varying payloads stop adding entries.
+_FRAME_CACHE_MAX = 32
+
+
 class SerialLineIO:
     """
     Robust serial line reader/writer.
 
     - Keeps leftover bytes between calls so we never lose data.
     - Uses the framed laser protocol only: send "$XXYYYYCC\\r\\n"
+    - Passing `log_fn=None` turns TX/RX logging off; log text is then
+      never formatted.
+    - DATA lines are logged every `data_log_every` lines when
+      `log_data_lines` is set. `sample_debug_lines=True` applies the same
+      sampling to $B0 debug telemetry, which is otherwise logged per line.
     """
 
     def __init__(
         self,
         ser: serial.Serial,
         *,
-        log_fn,
+        log_fn=None,
         log_data_lines: bool = False,
         data_log_every: int = 50,
+        sample_debug_lines: bool = False,
         default_command_id_hex2: str = "00",
         checksum_fn=default_checksum_hex_2,
     ):
         self.ser = ser
         self.log_fn = log_fn
-        self.buf = b""
-        self.log_data_lines = log_data_lines
+        self._request_low_latency()
+        # Mutable buffer: appending and consuming lines happen in place
+        # instead of copying the accumulated bytes on every read.
+        self.buf = bytearray()
+        # Complete lines already split out of `buf` (terminator removed),
+        # waiting to be returned by read_line.
+        self._lines: deque[str] = deque()
+        self.log_data_lines = bool(log_data_lines) and log_fn is not None
         self.data_log_every = max(1, int(data_log_every))
         self._data_seen = 0
+        self._sampled_prefixes = _DATA_AND_DEBUG_PREFIXES if sample_debug_lines else _DATA_PREFIXES
         self.default_command_id_hex2 = (default_command_id_hex2 or "00").strip().upper()
         self.checksum_fn = checksum_fn
+        # Framed bytes per (command id, payload). The checksum function is
+        # fixed per instance and the tuner only sends a handful of constant
+        # commands (RUN, STOP, shutter, GET_PID, ...), so each is framed once.
+        # Bounded by _FRAME_CACHE_MAX so varying payloads cannot grow it.
+        self._frame_cache: dict[tuple[str, str], bytes] = {}
+
+    def _request_low_latency(self) -> None:
+        """Ask the serial driver to deliver received bytes without batching.
+
+        USB adapters such as FTDI hold incoming bytes for up to 16 ms before
+        passing them on; on Linux pyserial can set ASYNC_LOW_LATENCY to cut
+        that to about 1 ms. Best effort: other platforms and drivers simply
+        keep their defaults.
+        """
+        set_low_latency_mode = getattr(self.ser, "set_low_latency_mode", None)
+        if set_low_latency_mode is None:
+            return
+        try:
+            set_low_latency_mode(True)
+        except (OSError, ValueError) as e:
+            if self.log_fn is not None:
+                self.log_fn(f"Serial low-latency mode unavailable: {e}")
+
+    def _framed(self, cid: str, data: str) -> bytes:
+        """Return the framed bytes for one command, composing them on first use."""
+        key = (cid, data)
+        framed = self._frame_cache.get(key)
+        if framed is None:
+            framed = compose_frame(cid, data, checksum_fn=self.checksum_fn)
+            if len(self._frame_cache) < _FRAME_CACHE_MAX:
+                self._frame_cache[key] = framed
+        return framed
 
     def write_command(self, data: str, *, command_id_hex2: str | None = None) -> None:
         """Send one framed command to the controller."""
         cid = self.default_command_id_hex2 if command_id_hex2 is None else str(command_id_hex2).strip().upper()
-        framed = compose_frame(cid, data, checksum_fn=self.checksum_fn)
-        self.log_fn(f"TX -> {framed!r}")
+        framed = self._framed(cid, data)
+        if self.log_fn is not None:
+            self.log_fn(f"TX -> {framed!r}")
         self.ser.write(framed)
 
     def read_line(self, timeout: float = 2.0, keep_terminator: bool = False) -> str:
         """Read one complete line from serial, preserving partial chunks safely."""
-        t0 = time.time()
-
-        while time.time() - t0 < timeout:
-            if b"\n" in self.buf:
-                # Consume exactly one line from the internal buffer.
-                line_bytes, self.buf = self.buf.split(b"\n", 1)
-                raw_line = (line_bytes + b"\n").decode("ascii", errors="ignore")
-                line = raw_line.rstrip("\r\n")
-
-                if line.startswith("DATA"):
-                    self._data_seen += 1
-                    if self.log_data_lines and (self._data_seen % self.data_log_every == 0):
-                        self.log_fn(f"RX <- {line}")
-                else:
+        # Monotonic clock: the deadline must not move with wall-clock changes.
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            if not self._lines:
+                self._split_complete_lines()
+            if self._lines:
+                # Consume exactly one line from the decoded line queue.
+                raw_line = self._lines.popleft()
+                line = raw_line.rstrip("\r")
+
+                # Sampled telemetry (DATA, plus B0 when opted in) arrives at
+                # the sample rate, so it is only logged every Nth line on
+                # request; other lines are formatted only when log_fn is set.
+                if line.startswith(self._sampled_prefixes):
+                    # With data logging off (the usual case) nothing is counted.
+                    if self.log_data_lines:
+                        self._data_seen += 1
+                        if self._data_seen % self.data_log_every == 0:
+                            self.log_fn(f"RX <- {line}")
+                elif self.log_fn is not None:
                     self.log_fn(f"RX <- {line}")
 
                 if keep_terminator:
-                    return raw_line
+                    return raw_line + "\n"
                 return line
 
-            # Pull more bytes from serial and append to buffer.
-            chunk = self.ser.read(256)
+            # Pull more bytes from serial and append to buffer: wait in the
+            # driver for the next byte (up to the port timeout), then take
+            # whatever is already queued behind it.
+            chunk = self.ser.read(self.ser.in_waiting or 1)
             if chunk:
-                self.buf += chunk
-            else:
+                self.buf.extend(chunk)
+            elif self.ser.timeout == 0:
+                # Non-blocking port: avoid spinning while the line is idle.
                 time.sleep(0.01)
 
         raise TimeoutError("Timed out waiting for serial data")
 
+    def _split_complete_lines(self) -> None:
+        """Move every complete line in `buf` to the line queue in one pass.
+
+        A burst of telemetry is decoded and split once instead of once per
+        line; any trailing partial line stays in `buf`.
+        """
+        end = self.buf.rfind(b"\n") + 1
+        if end:
+            text = self.buf[:end].decode("ascii", errors="ignore")
+            del self.buf[:end]
+            # The text ends with "\n", so the last split item is always empty.
+            self._lines.extend(text.split("\n")[:-1])
+
     def get_pid_values(self, timeout: float = 2.0) -> dict:
         """Send GET_PID and wait until a valid B6 reply is parsed."""
-        cmd_bytes = compose_frame("B6", "", checksum_fn=self.checksum_fn)
-        self.log_fn(f"TX -> {cmd_bytes!r}")
+        cmd_bytes = self._framed("B6", "")
+        if self.log_fn is not None:
+            self.log_fn(f"TX -> {cmd_bytes!r}")
         self.ser.write(cmd_bytes)
-        deadline = time.time() + timeout
+        deadline = time.monotonic() + timeout
         last_error = None
 
-        while time.time() < deadline:
-            remaining = deadline - time.time()
+        while time.monotonic() < deadline:
+            remaining = deadline - time.monotonic()
             if remaining <= 0:
                 break
             reply = self.read_line(timeout=remaining, keep_terminator=True)
@@ -103,14 +185,15 @@ class SerialLineIO:
 
     def get_program_values(self, timeout: float = 2.0) -> dict:
         """Send GET_PROGRAM and wait until a valid 41 reply is parsed."""
-        cmd_bytes = compose_frame("41", "00", checksum_fn=self.checksum_fn)
-        self.log_fn(f"TX -> {cmd_bytes!r}")
+        cmd_bytes = self._framed("41", "00")
+        if self.log_fn is not None:
+            self.log_fn(f"TX -> {cmd_bytes!r}")
         self.ser.write(cmd_bytes)
-        deadline = time.time() + timeout
+        deadline = time.monotonic() + timeout
         last_error = None
 
-        while time.time() < deadline:
-            remaining = deadline - time.time()
+        while time.monotonic() < deadline:
+            remaining = deadline - time.monotonic()
             if remaining <= 0:
                 break
             reply = self.read_line(timeout=remaining, keep_terminator=True)
@@ -137,10 +220,10 @@ class SerialLineIO:
         Ignores non-ACK lines (e.g. telemetry/debug) until timeout.
         """
         self.write_command(data, command_id_hex2=command_id_hex2)
-        deadline = time.time() + timeout
+        deadline = time.monotonic() + timeout
 
-        while time.time() < deadline:
-            remaining = deadline - time.time()
+        while time.monotonic() < deadline:
+            remaining = deadline - time.monotonic()
             if remaining <= 0:
                 break
             line = self.read_line(timeout=remaining)
@@ -190,7 +273,8 @@ class SerialLineIO:
             checksum_fn=self.checksum_fn,
         )
 
-        self.log_fn(f"TX -> {cmd_bytes!r}")
+        if self.log_fn is not None:
+            self.log_fn(f"TX -> {cmd_bytes!r}")
         self.ser.write(cmd_bytes)
         ack = self.read_line(timeout=timeout)
         return ack
@@ -222,7 +306,8 @@ class SerialLineIO:
             current_values=current_values,
             checksum_fn=self.checksum_fn,
         )
-        self.log_fn(f"TX -> {cmd_bytes!r}")
+        if self.log_fn is not None:
+            self.log_fn(f"TX -> {cmd_bytes!r}")
         self.ser.write(cmd_bytes)
         ack = self.read_line(timeout=timeout)
         return ack
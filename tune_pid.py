@@ -9,6 +9,7 @@ This script provides:
 """
 
 import csv
+import os
 from datetime import datetime
 
 import numpy as np
@@ -164,6 +165,14 @@ def reset_pid_defaults(io: SerialLineIO) -> None:
         raise RuntimeError(f"Reset returned error code: {ack}")
 
 
+# Join per-repeat sample arrays into one array for the whole candidate.
+def _join_samples(chunks: list[np.ndarray]) -> np.ndarray:
+    """Join per-repeat sample arrays into one float array (empty if none)."""
+    if not chunks:
+        return np.array([], dtype=float)
+    return np.concatenate(chunks)
+
+
 # Run one PID candidate across repeated timed tests.
 def run_trial(
     io: SerialLineIO,
@@ -188,11 +197,17 @@ def run_trial(
     overall_trial_index: int | None = None,
     repeat_cancel_osc_threshold: float = 0.35,
     repeat_cancel_score_regression_pct: float = 8.0,
+    best_score: float | None = None,
+    score_fn=None,
 ):
     """Run one PID candidate through repeated laser tests and collect telemetry.
 
     A "trial" in this project means one PID tuple (kp, ki, kd) tested several
     times (`repeats`) so scoring is less sensitive to one noisy run.
+
+    When `best_score` and `score_fn` (metrics dict -> score) are given, the
+    remaining repeats are cancelled once the finished repeats alone already
+    guarantee a score worse than `best_score`.
     """
     _ = duration  # Kept for CLI compatibility with older call sites.
     log(f"Starting trial: kp={kp:.4f}, ki={ki:.4f}, kd={kd:.4f}")
@@ -265,8 +280,11 @@ def run_trial(
         elif trial_index is not None:
             monitor.set_progress(f"Trial {trial_index} | configuring hardware")
 
-    # Prepare output arrays for all repeats under this PID candidate.
-    t_vals, y_vals, u_vals, status_vals = [], [], [], []
+    # Per-repeat sample arrays; joined into one array per field at the end.
+    t_chunks: list[np.ndarray] = []
+    y_chunks: list[np.ndarray] = []
+    u_chunks: list[np.ndarray] = []
+    status_chunks: list[np.ndarray] = []
     per_test_powers: list[np.ndarray] = []
     per_test_times: list[np.ndarray] = []
     per_test_meta: list[dict] = []
@@ -310,7 +328,8 @@ def run_trial(
                 "start_skewed": False,
                 "start_skew_error": 0.0,
             }
-            recent_within_5pct = []
+            # Length of the current run of consecutive in-band (+/-5%) samples.
+            in_band_run = 0
             strict_bad_count = 0
             strict_total = 0
             settled_errors: list[float] = []
@@ -322,18 +341,18 @@ def run_trial(
             limit_1 = 0.01 * base
             osc_deadband = 0.03 * base
 
-            def on_sample(t_val, mapped) -> bool:
-                nonlocal strict_bad_count, strict_total, first_seen
-                y_val = float(mapped["process_value"])
+            def on_sample(t_val, sample) -> bool:
+                nonlocal strict_bad_count, strict_total, first_seen, in_band_run
+                _, y_val, _, sample_status, initial_power = sample
                 if monitor is not None:
-                    monitor.append_sample(t_val, y_val, status=str(mapped.get("status", "RUNNING")))
+                    monitor.append_sample(t_val, y_val, status=sample_status)
                 err = y_val - desired_output
                 abs_err = abs(err)
 
                 if not first_seen:
                     first_seen = True
                     # Use the B0 initial power field (first section) when available.
-                    first_power = float(mapped.get("initial_power", y_val))
+                    first_power = initial_power if initial_power is not None else y_val
                     first_err = abs(first_power - desired_output)
                     low_limit = desired_output - limit_30
                     high_limit = desired_output + limit_30
@@ -353,14 +372,15 @@ def run_trial(
                 if t_val < startup_grace_s:
                     return False
 
-                within_5 = abs_err <= limit_5
-                recent_within_5pct.append(within_5)
-                if len(recent_within_5pct) > settled_window_samples:
-                    recent_within_5pct.pop(0)
+                # Settled once the last `settled_window_samples` readings were
+                # all in band, i.e. the current in-band run is long enough.
+                if abs_err <= limit_5:
+                    in_band_run += 1
+                else:
+                    in_band_run = 0
 
-                if (not test_meta["settled"]) and len(recent_within_5pct) == settled_window_samples:
-                    if all(recent_within_5pct):
-                        test_meta["settled"] = True
+                if (not test_meta["settled"]) and in_band_run >= settled_window_samples:
+                    test_meta["settled"] = True
 
                 if test_meta["settled"]:
                     if abs_err > limit_5:
@@ -384,6 +404,11 @@ def run_trial(
 
                 return False
 
+            # Size sample buffers from the expected sample count for this window.
+            capacity_hint = 256
+            if sample_interval_s is not None and sample_interval_s > 0:
+                capacity_hint = int(test_duration_s / sample_interval_s) + 16
+
             # Collect telemetry for a fixed window, then stop this test pass.
             rt, ry, ru, rs = collect_trial_data(
                 io,
@@ -392,14 +417,15 @@ def run_trial(
                 duration_s=test_duration_s,
                 stop_on_done=False,
                 on_sample=on_sample,
+                capacity_hint=capacity_hint,
             )
 
             # Shift each repeat's time axis so combined arrays stay monotonic.
             t_offset = rep * test_duration_s
-            t_vals.extend([float(v) + t_offset for v in rt])
-            y_vals.extend(ry)
-            u_vals.extend(ru)
-            status_vals.extend(rs)
+            t_chunks.append(rt + t_offset)
+            y_chunks.append(ry)
+            u_chunks.append(ru)
+            status_chunks.append(rs)
             per_test_powers.append(np.array(ry, dtype=float))
             per_test_times.append(np.array(rt, dtype=float))
 
@@ -423,7 +449,7 @@ def run_trial(
             else:
                 test_meta["oscillation_rate"] = 0.0 if test_meta["settled"] else 1.0
 
-            if not ry and not test_meta["invalid"]:
+            if ry.size == 0 and not test_meta["invalid"]:
                 test_meta["invalid"] = True
                 test_meta["reason"] = "no samples collected"
             if not test_meta["settled"] and not test_meta["invalid"]:
@@ -435,7 +461,7 @@ def run_trial(
             repeat_scores.append(repeat_score)
 
             # Print quick power stats for this repeat to spot unstable behavior.
-            if ry:
+            if ry.size:
                 avg_power = float(np.mean(ry))
                 min_power = float(np.min(ry))
                 max_power = float(np.max(ry))
@@ -469,6 +495,26 @@ def run_trial(
                         f"({repeat_score:.3f} > {prev_repeat_score:.3f})"
                     )
 
+            # Metrics are non-negative means over all repeats, so the finished
+            # repeats scaled by their share give a lower bound on the final score.
+            # Empty repeats fall back to placeholder metrics, so skip the bound then.
+            if (
+                not cancelled_candidate
+                and best_score is not None
+                and score_fn is not None
+                and rep + 1 < repeats
+                and all(powers.size for powers in per_test_powers)
+            ):
+                partial_metrics = compute_trial_metrics(per_test_powers, per_test_meta, desired_output)
+                partial_metrics["repeatability"] = 0.0
+                score_bound = score_fn(partial_metrics) * (rep + 1) / repeats
+                if score_bound > best_score:
+                    cancelled_candidate = True
+                    cancel_reason = (
+                        f"score after repeat {rep + 1} already worse than best "
+                        f"({score_bound:.3f} > {best_score:.3f})"
+                    )
+
             if not test_meta["stopped_early"]:
                 io.write_command_expect_ok_ack("", command_id_hex2=CMD.STOP, timeout=2.0)
                 log(f"Test {rep + 1}/{repeats}: STOP")
@@ -508,7 +554,8 @@ def run_trial(
             elif trial_index is not None:
                 monitor.set_progress(f"Trial {trial_index} | shutter closed, standby set")
 
-    aborted = any(s == "ABORT" for s in status_vals)
+    # Compare each repeat's status array in one numpy pass instead of per sample.
+    aborted = any(bool(np.any(rs == "ABORT")) for rs in status_chunks)
     start_skew_count = sum(1 for meta in per_test_meta if bool(meta.get("start_skewed", False)))
     start_skew_threshold = max(2, (len(per_test_meta) // 2) + 1) if per_test_meta else 2
     if start_skew_count >= start_skew_threshold:
@@ -528,12 +575,12 @@ def run_trial(
     if aborted:
         log("Warning: Trial aborted due to safety condition")
     if cancelled_candidate:
-        log(f"Trial ended early after repeated-test regression: {cancel_reason}")
+        log(f"Trial ended early, remaining repeats cancelled: {cancel_reason}")
 
     return (
-        np.array(t_vals),
-        np.array(y_vals),
-        np.array(u_vals),
+        _join_samples(t_chunks),
+        _join_samples(y_chunks),
+        _join_samples(u_chunks),
         aborted,
         current_pid,
         per_test_powers,
@@ -842,6 +889,61 @@ def filter_seed_points_for_space(
     return filtered_points, filtered_scores
 
 
+def promote_partial_history(partial_path: str, history_path: str) -> bool:
+    """Move an unfinished session's history into place if it recorded any trials.
+
+    Returns True when rows were promoted. A header-only file is removed so it
+    never replaces the previous session's history.
+    """
+    try:
+        with open(partial_path, newline="") as f:
+            has_rows = sum(1 for _ in csv.reader(f)) > 1
+    except OSError:
+        return False
+    if has_rows:
+        os.replace(partial_path, history_path)
+    else:
+        os.remove(partial_path)
+    return has_rows
+
+
+def load_history_seed_points(
+    path: str,
+    session_settings: dict[str, float],
+) -> tuple[list[tuple[float, float, float]], list[float]]:
+    """Read (kp, ki, kd) -> score observations from a previous tuning_history.csv.
+
+    Scores depend on the session setup (goal power, frequency, test length,
+    repeats, scoring weights), so only rows recorded with the same
+    `session_settings` columns are used. Files written before those columns
+    existed yield nothing. Candidates whose repeats were cancelled are skipped
+    too: their score covers only part of the planned repeats.
+    """
+    points: list[tuple[float, float, float]] = []
+    scores: list[float] = []
+    try:
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                try:
+                    point = (float(row["kp"]), float(row["ki"]), float(row["kd"]))
+                    score = float(row["score"])
+                    recorded = [float(row[name]) for name in session_settings]
+                    cancelled = int(row["cancelled_repeats"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if cancelled:
+                    continue
+                if not np.isfinite(score):
+                    continue
+                if not np.allclose(recorded, list(session_settings.values()), rtol=1e-9, atol=1e-12):
+                    continue
+                points.append(point)
+                scores.append(score)
+    except OSError:
+        return [], []
+    return points, scores
+
+
 def format_readiness_status(
     *,
     region_status: dict,
@@ -961,6 +1063,12 @@ def main():
     ap.add_argument("--iters", type=int, default=20, help="Number of tuning trials")
     ap.add_argument("--log-data", action="store_true", help="Log some DATA lines too (can be spammy)")
     ap.add_argument("--log-data-every", type=int, default=50, help="If --log-data, log every Nth DATA line")
+    ap.add_argument(
+        "--sample-debug-log",
+        action="store_true",
+        help="Treat $B0 debug telemetry like DATA lines in the RX log (sampled by --log-data/--log-data-every) "
+        "instead of logging every line",
+    )
     ap.add_argument("--kp-max", type=float, default=1.0, help="Upper limit for Kp search/clamp")
     ap.add_argument("--ki-max", type=float, default=1.0, help="Upper limit for Ki search/clamp")
     ap.add_argument("--kd-max", type=float, default=0.2, help="Upper limit for Kd search/clamp")
@@ -1090,6 +1198,11 @@ def main():
         help="Number of repeated tests per candidate during Bayesian optimisation",
     )
     ap.add_argument("--frequency-khz", type=int, default=0, help="Laser frequency in kHz for the startup program command")
+    ap.add_argument(
+        "--no-warm-start",
+        action="store_true",
+        help="Ignore tuning_history.csv from previous sessions when seeding Bayesian optimisation",
+    )
     args = ap.parse_args()
 
     default_goal = float(args.desired_output)
@@ -1103,6 +1216,7 @@ def main():
                 log_fn=log,
                 log_data_lines=args.log_data,
                 data_log_every=args.log_data_every,
+                sample_debug_lines=args.sample_debug_log,
             )
             default_goal, default_frequency_khz = get_program_defaults(
                 startup_io,
@@ -1160,11 +1274,13 @@ def main():
 
         log("Opening serial port")
         ser = serial.Serial(args.port, args.baud, timeout=0.1)
+        history_file = None
         io = SerialLineIO(
             ser,
             log_fn=log,
             log_data_lines=args.log_data,
             data_log_every=args.log_data_every,
+            sample_debug_lines=args.sample_debug_log,
         )
         try:
             if action == "reset":
@@ -1209,8 +1325,90 @@ def main():
 
             duration = 15.0
 
-            # Keep a trial-by-trial record for later review.
-            history = []
+            def score_metrics(metrics: dict, aborted: bool = False) -> float:
+                return score_controller(
+                    metrics,
+                    w_start=args.w_start,
+                    w_track=args.w_track,
+                    w_dev=args.w_dev,
+                    w_max=args.w_max,
+                    w_repeat=args.w_repeat,
+                    w_strict=args.w_strict,
+                    w_osc=args.w_osc,
+                    invalid_penalty=args.invalid_penalty,
+                    aborted=aborted,
+                )
+
+            # The score-bound repeat cancel assumes every score term is
+            # non-negative, which only holds when no weight is negative.
+            score_weights = {
+                "w_start": args.w_start,
+                "w_track": args.w_track,
+                "w_dev": args.w_dev,
+                "w_max": args.w_max,
+                "w_repeat": args.w_repeat,
+                "w_strict": args.w_strict,
+                "w_osc": args.w_osc,
+                "invalid_penalty": args.invalid_penalty,
+            }
+            bound_score_fn = score_metrics if all(w >= 0 for w in score_weights.values()) else None
+            if bound_score_fn is None:
+                log("Score-bound repeat cancel disabled: a score weight is negative")
+
+            # Everything a score depends on besides the PID gains. Recorded on
+            # each history row so a later warm start only reuses comparable scores.
+            session_settings = {
+                "desired_output": float(desired_output),
+                "frequency_khz": float(frequency_khz),
+                "test_duration_s": float(test_duration_s),
+                "warmup_repeats": float(args.warmup_repeats),
+                "bo_repeats": float(args.bo_repeats),
+                "settled_window_samples": float(args.settled_window_samples),
+                "startup_grace_s": float(args.startup_grace_s),
+                **score_weights,
+            }
+            # A session that was killed outright leaves its rows behind.
+            if promote_partial_history("tuning_history.csv.partial", "tuning_history.csv"):
+                log("Recovered unfinished session rows from tuning_history.csv.partial")
+            if args.no_warm_start:
+                prior_points, prior_scores = [], []
+            else:
+                prior_points, prior_scores = load_history_seed_points("tuning_history.csv", session_settings)
+                if prior_points:
+                    log(
+                        f"Loaded {len(prior_points)} previous trials with the same session settings "
+                        "from tuning_history.csv for BO warm start"
+                    )
+
+            # Keep a trial-by-trial record for later review. Rows are written
+            # to a session file as each trial finishes, so a crash or Ctrl+C
+            # keeps the results without touching the previous session's
+            # tuning_history.csv; it is only replaced once the session ends.
+            history_file = open("tuning_history.csv.partial", "w", newline="")
+            history_writer = csv.writer(history_file)
+            history_writer.writerow(
+                [
+                    "kp",
+                    "ki",
+                    "kd",
+                    "score",
+                    "improve_vs_baseline_pct",
+                    "best_improve_vs_baseline_pct",
+                    "start_error",
+                    "track_error",
+                    "deviation",
+                    "max_error",
+                    "strict_bad_rate",
+                    "oscillation_rate",
+                    "invalid_ratio",
+                    "repeatability",
+                    "cancelled_repeats",
+                    "cancel_reason",
+                    "aborted",
+                    *session_settings,
+                ]
+            )
+
             power_rows = []
             trial_index = 0
             warmup_trial_count = 0
@@ -1325,6 +1523,10 @@ def main():
                     overall_trial_index=trial_index + 1,
                     repeat_cancel_osc_threshold=args.repeat_cancel_osc_threshold,
                     repeat_cancel_score_regression_pct=args.repeat_cancel_score_regression_pct,
+                    # Score-bound cancels are BO-only: warmup cancels mark a
+                    # candidate unsafe, which would shrink the BO search region.
+                    best_score=best_score_seen if is_bayes_mode else None,
+                    score_fn=bound_score_fn,
                 )
 
                 used_kp, used_ki, used_kd = kp, ki, kd
@@ -1344,18 +1546,7 @@ def main():
                     last_applied = (used_kp, used_ki, used_kd)
 
                 metrics = compute_trial_metrics(per_test_powers, per_test_meta, desired_output)
-                score = score_controller(
-                    metrics,
-                    w_start=args.w_start,
-                    w_track=args.w_track,
-                    w_dev=args.w_dev,
-                    w_max=args.w_max,
-                    w_repeat=args.w_repeat,
-                    w_strict=args.w_strict,
-                    w_osc=args.w_osc,
-                    invalid_penalty=args.invalid_penalty,
-                    aborted=aborted,
-                )
+                score = score_metrics(metrics, aborted=aborted)
 
                 prev_best_score = best_score_seen
                 if baseline_score is None:
@@ -1482,7 +1673,7 @@ def main():
                             monitor.set_progress("Bayesian optimisation ready | preparing search space")
                             monitor.set_warmup_change("Warmup change: complete")
 
-                history.append(
+                history_writer.writerow(
                     (
                         used_kp,
                         used_ki,
@@ -1501,8 +1692,10 @@ def main():
                         int(cancelled_candidate),
                         cancel_reason,
                         int(aborted),
+                        *session_settings.values(),
                     )
                 )
+                history_file.flush()
 
                 for test_idx, (test_powers, test_times, test_meta) in enumerate(
                     zip(per_test_powers, per_test_times, per_test_meta),
@@ -1564,18 +1757,7 @@ def main():
                         repeat_cancel_score_regression_pct=args.repeat_cancel_score_regression_pct,
                     )
                     bmetrics = compute_trial_metrics(btests, bmeta, desired_output)
-                    bscore = score_controller(
-                        bmetrics,
-                        w_start=args.w_start,
-                        w_track=args.w_track,
-                        w_dev=args.w_dev,
-                        w_max=args.w_max,
-                        w_repeat=args.w_repeat,
-                        w_strict=args.w_strict,
-                        w_osc=args.w_osc,
-                        invalid_penalty=args.invalid_penalty,
-                        aborted=baborted,
-                    )
+                    bscore = score_metrics(bmetrics, aborted=baborted)
                     log(
                         f"Best re-test -> score={bscore:.2f}, "
                         f"track_err={bmetrics['track_error']:.5f}, dev={bmetrics['deviation']:.5f}, "
@@ -1694,15 +1876,25 @@ def main():
                         observed_scores,
                         bayes_space,
                     )
+                    warm_points, warm_scores = filter_seed_points_for_space(
+                        prior_points,
+                        prior_scores,
+                        bayes_space,
+                    )
+                    if warm_points:
+                        log(f"Warm-starting BO with {len(warm_points)} previous trials inside the search space")
+                    # Matching earlier trials in this box stand in for random
+                    # initial points, one for one.
+                    n_initial_points = max(0, min(4, max(1, n_trials)) - len(warm_points))
                     gp_minimize(
                         lambda x: evaluate_candidate(float(x[0]), float(x[1]), float(x[2]), mode="bayes"),
                         bayes_space,
                         n_calls=n_trials,
-                        n_initial_points=min(4, max(1, n_trials)),
+                        n_initial_points=n_initial_points,
                         acq_func="EI",
                         random_state=42,
-                        x0=seed_points if seed_points else None,
-                        y0=seed_scores if seed_scores else None,
+                        x0=(warm_points + seed_points) or None,
+                        y0=(warm_scores + seed_scores) or None,
                     )
                 else:
                     log(
@@ -1751,30 +1943,8 @@ def main():
             if best_score_seen < float("inf"):
                 log(f"Best score={best_score_seen:.3f}")
 
-            with open("tuning_history.csv", "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        "kp",
-                        "ki",
-                        "kd",
-                        "score",
-                        "improve_vs_baseline_pct",
-                        "best_improve_vs_baseline_pct",
-                        "start_error",
-                        "track_error",
-                        "deviation",
-                        "max_error",
-                        "strict_bad_rate",
-                        "oscillation_rate",
-                        "invalid_ratio",
-                        "repeatability",
-                        "cancelled_repeats",
-                        "cancel_reason",
-                        "aborted",
-                    ]
-                )
-                writer.writerows(history)
+            history_file.close()
+            os.replace("tuning_history.csv.partial", "tuning_history.csv")
             log("Saved tuning_history.csv")
 
             with open("tuning_power_readings.csv", "w", newline="") as f:
@@ -1801,6 +1971,11 @@ def main():
             if monitor is not None:
                 monitor.mark_complete("Optimisation complete. Returning to main menu.")
         finally:
+            if history_file is not None:
+                history_file.close()
+                # Interrupted sessions still keep the trials they finished.
+                if promote_partial_history("tuning_history.csv.partial", "tuning_history.csv"):
+                    log("Saved tuning_history.csv from an unfinished session")
             ser.close()
 
 